@@ -48,6 +48,10 @@ fi
 echo "🐳 Building Docker image..."
 docker build -t $APP_NAME:latest .
 
+# Create/update MongoDB indexes once, before any worker starts
+echo "🗂️ Initializing MongoDB indexes..."
+docker run --rm --env-file .env $APP_NAME:latest python deployment/scripts/init_indexes.py
+
 # Stop existing container if running
 echo "🛑 Stopping existing container..."
 docker stop $APP_NAME 2>/dev/null || true
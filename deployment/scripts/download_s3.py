@@ -4,9 +4,15 @@ Simple S3 download script.
 Downloads all files from S3 bucket and organizes them in the root path.
 """
 
+import json
 import os
+import shutil
 import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from s3transfer.manager import TransferManager
 
 def download_from_s3():
     """Download all files from S3 bucket to local directory."""
@@ -15,6 +21,7 @@ def download_from_s3():
     bucket_name = os.getenv('MODEL_S3_BUCKET', 'nudgedaily')
     s3_prefix = os.getenv('MODEL_S3_PREFIX', 'models/')
     local_dir = os.getenv('MODEL_LOCAL_DIR', '/home/app/models/smart-turn-v2')
+    workers = int(os.getenv('S3_DOWNLOAD_WORKERS', '16'))
     
     print(f"📥 Downloading from S3 bucket: {bucket_name}")
     print(f"📁 Local directory: {local_dir}")
@@ -23,21 +30,104 @@ def download_from_s3():
     # Create local directory
     Path(local_dir).mkdir(parents=True, exist_ok=True)
     
-    # Initialize S3 client
-    s3_client = boto3.client('s3')
+    # Initialize S3 client - botocore clients are thread-safe, so one client (and one
+    # keep-alive connection pool larger than the worker count) is shared by all transfer
+    # threads; an undersized pool discards connections and forces fresh TLS handshakes
+    s3_client = boto3.client(
+        's3',
+        config=Config(
+            max_pool_connections=max(workers * 2, 50),
+            retries={'mode': 'adaptive', 'max_attempts': 5},
+            tcp_keepalive=True,
+        ),
+    )
     
-    # Download all files
+    # Large model shards are fetched as parallel ranged GETs; small files stay single-stream.
+    # max_concurrency bounds the whole transfer, not each file, since one manager runs all keys
+    transfer_config = TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', '16')) * 1024 * 1024,
+        max_concurrency=workers,
+        use_threads=True,
+        io_chunksize=1024 * 1024,
+        max_io_queue=1000,
+        # 'crt' hands all chunking and I/O to the native AWS CRT client when awscrt is
+        # installed (pip install "boto3[crt]"); 'auto' only does so on supported instances
+        preferred_transfer_client=os.getenv('S3_TRANSFER_CLIENT', 'auto'),
+    )
+    
+    # List the bucket lazily; each page is consumed as soon as it arrives
     paginator = s3_client.get_paginator('list_objects_v2')
     pages = paginator.paginate(Bucket=bucket_name, Prefix=s3_prefix)
     
-    for page in pages:
-        if 'Contents' in page:
-            for obj in page['Contents']:
-                s3_key = obj['Key']
-                local_file_path = Path(local_dir) / Path(s3_key).name
-                
-                print(f"📥 Downloading: {s3_key} -> {local_file_path}")
-                s3_client.download_file(bucket_name, s3_key, str(local_file_path))
+    # ETags of previously downloaded objects, used to skip unchanged files on warm restarts
+    manifest_path = Path(local_dir) / '.etags.json'
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    
+    def download_small(s3_key, local_file_path):
+        # Below the multipart threshold a single streamed GET is cheaper than s3transfer's
+        # per-file task and IO-queue setup
+        response = s3_client.get_object(Bucket=bucket_name, Key=s3_key)
+        # Stage next to the destination and rename into place, so an interrupted download
+        # never leaves a truncated file behind (s3transfer does the same for large files)
+        part_path = local_file_path.with_name(local_file_path.name + '.part')
+        try:
+            with open(part_path, 'wb') as f:
+                shutil.copyfileobj(response['Body'], f, length=1024 * 1024)
+            os.replace(part_path, local_file_path)
+        finally:
+            part_path.unlink(missing_ok=True)
+    
+    # Large files go through a single transfer manager so whole files and ranged parts share
+    # one bounded worker pool instead of nesting a thread pool per file; small files are
+    # streamed directly on a sibling pool. Submitting is non-blocking, so workers start on
+    # the first page while later pages are still listed.
+    try:
+        with (
+            create_transfer_manager(s3_client, transfer_config) as manager,
+            ThreadPoolExecutor(max_workers=workers) as executor,
+        ):
+            # The CRT client is faster than Python for every size, so only bypass it when
+            # boto3 fell back to the pure-Python transfer manager
+            stream_small = isinstance(manager, TransferManager)
+            futures = []
+            skipped = 0
+            for page in pages:
+                if 'Contents' in page:
+                    for obj in page['Contents']:
+                        s3_key = obj['Key']
+                        local_file_path = Path(local_dir) / Path(s3_key).name
+                        if (
+                            local_file_path.exists()
+                            and local_file_path.stat().st_size == obj['Size']
+                            and manifest.get(s3_key) == obj['ETag']
+                        ):
+                            skipped += 1
+                            continue
+                        manifest.pop(s3_key, None)
+                        
+                        if stream_small and obj['Size'] < transfer_config.multipart_threshold:
+                            future = executor.submit(download_small, s3_key, local_file_path)
+                        else:
+                            future = manager.download(
+                                bucket_name, s3_key, str(local_file_path)
+                            )
+                        futures.append((s3_key, obj['ETag'], future))
+            print(f"📥 Downloading {len(futures)} files ({skipped} already up to date)")
+            # Progress is reported from this thread only, in batches, so transfer workers
+            # never contend on stdout
+            step = max(len(futures) // 10, 1)
+            for done, (s3_key, etag, future) in enumerate(futures, start=1):
+                future.result()
+                manifest[s3_key] = etag
+                if done % step == 0 or done == len(futures):
+                    print(f"📥 Downloaded {done}/{len(futures)}")
+    finally:
+        # Persist whatever completed so a partial failure doesn't force a full re-download
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
     
     print("✅ Download complete!")
     
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Idempotent MongoDB index setup for the memory store.
+Run once per deploy, before starting the bot, so workers never build or wait
+on the vector search index during startup.
+"""
+
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+from langgraph.store.mongodb.base import MongoDBStore, VectorIndexConfig
+from pymongo.mongo_client import MongoClient
+from pymongo.server_api import ServerApi
+
+load_dotenv()
+
+# Longest wait for a re-quantized index to become queryable before failing the deploy
+INDEX_READY_TIMEOUT_SECS = 600
+
+def init_indexes():
+    """Create the memory vector index if missing and wait until it is queryable."""
+    
+    dims = int(os.getenv('MEMORY_EMBEDDING_DIMS', '1536'))
+    client = MongoClient(os.environ['MONGODB_URI'], server_api=ServerApi('1'))
+    collection = client["memories"]["memory_store"]
+    
+    # An existing index is left as is, so one built for another vector size would silently
+    # serve mismatched queries; refuse to deploy until the memories are migrated
+    for index in collection.list_search_indexes():
+        if index.get('type') != 'vectorSearch':
+            continue
+        for field in index['latestDefinition'].get('fields', []):
+            if field.get('type') == 'vector' and field.get('numDimensions') != dims:
+                print(
+                    f"❌ Index {index['name']} has {field.get('numDimensions')} dimensions but "
+                    f"MEMORY_EMBEDDING_DIMS is {dims}; run migrate_embeddings.py first"
+                )
+                sys.exit(1)
+    
+    # Same store config as src/graph.py; the store creates its vectorSearch index when
+    # missing and blocks here (instead of in the bot) until it is ready
+    print(f"🔧 Ensuring vector index with {dims} dimensions")
+    MongoDBStore(
+        collection=collection,
+        index_config=VectorIndexConfig(
+            fields=None,
+            filters=None,
+            dims=dims,
+            embed=OpenAIEmbeddings(model="text-embedding-3-small", dimensions=dims),
+        ),
+        auto_index_timeout=300,
+    )
+    
+    # Opt-in scalar (int8) quantization shrinks the in-memory HNSW vectors ~4x at some cost in
+    # recall; Atlas keeps serving the current index while the quantized one builds
+    if os.getenv('MEMORY_INDEX_QUANTIZE', 'false').lower() == 'true':
+        enable_scalar_quantization(collection)
+    
+    print("✅ Indexes ready!")
+
+def enable_scalar_quantization(collection):
+    """Set scalar quantization on every vectorSearch index and wait for the rebuild."""
+    
+    for index in collection.list_search_indexes():
+        if index.get('type') != 'vectorSearch':
+            continue
+        definition = index['latestDefinition']
+        vector_fields = [f for f in definition.get('fields', []) if f.get('type') == 'vector']
+        if all(f.get('quantization') == 'scalar' for f in vector_fields):
+            continue
+        for field in vector_fields:
+            field['quantization'] = 'scalar'
+        print(f"🔧 Enabling scalar quantization on index: {index['name']}")
+        collection.update_search_index(index['name'], definition)
+        
+        deadline = time.monotonic() + INDEX_READY_TIMEOUT_SECS
+        while True:
+            statuses = [
+                (ix.get('status'), ix.get('queryable'))
+                for ix in collection.list_search_indexes(index['name'])
+            ]
+            if any(status == 'FAILED' for status, _ in statuses):
+                print(f"❌ Index {index['name']} failed to build")
+                sys.exit(1)
+            if all(status == 'READY' and queryable for status, queryable in statuses):
+                break
+            if time.monotonic() > deadline:
+                print(f"❌ Index {index['name']} not ready after {INDEX_READY_TIMEOUT_SECS}s")
+                sys.exit(1)
+            time.sleep(5)
+
+if __name__ == "__main__":
+    init_indexes()
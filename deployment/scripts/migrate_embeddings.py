@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+One-shot migration for changing the memory embedding size.
+Drops the memory collection's vector index and re-embeds every stored memory
+at MEMORY_EMBEDDING_DIMS so it matches what the bot writes and queries.
+"""
+
+import os
+import time
+
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+from langgraph.store.base import PutOp
+from langgraph.store.mongodb.base import MongoDBStore, VectorIndexConfig
+from pymongo.mongo_client import MongoClient
+from pymongo.server_api import ServerApi
+
+load_dotenv()
+
+BATCH_SIZE = 2048
+
+def migrate_embeddings():
+    """Rebuild the vector index and re-embed all memories at the configured size."""
+    
+    dims = int(os.getenv('MEMORY_EMBEDDING_DIMS', '1536'))
+    client = MongoClient(os.environ['MONGODB_URI'], server_api=ServerApi('1'))
+    collection = client["memories"]["memory_store"]
+    
+    # The old index was built for a different vector size and must be replaced
+    for index in collection.list_search_indexes():
+        if index.get('type') == 'vectorSearch':
+            print(f"🗑️  Dropping vector index: {index['name']}")
+            collection.drop_search_index(index['name'])
+    while any(ix.get('type') == 'vectorSearch' for ix in collection.list_search_indexes()):
+        time.sleep(2)
+    
+    # Recreates the index at the new size, matching the store config in src/graph.py
+    print(f"🔧 Creating vector index with {dims} dimensions")
+    store = MongoDBStore(
+        collection=collection,
+        index_config=VectorIndexConfig(
+            fields=None,
+            filters=None,
+            dims=dims,
+            embed=OpenAIEmbeddings(model="text-embedding-3-small", dimensions=dims),
+        ),
+        auto_index_timeout=120,
+    )
+    
+    # Re-put every memory through the store so it is re-embedded exactly as the bot would
+    items = []
+    while True:
+        page = store.search(("memories",), limit=BATCH_SIZE, offset=len(items))
+        items.extend(page)
+        if len(page) < BATCH_SIZE:
+            break
+    print(f"📥 Re-embedding {len(items)} memories")
+    
+    for start in range(0, len(items), BATCH_SIZE):
+        batch = items[start:start + BATCH_SIZE]
+        store.batch([PutOp(item.namespace, item.key, item.value) for item in batch])
+        print(f"✅ Re-embedded {start + len(batch)}/{len(items)}")
+    
+    print("✅ Migration complete!")
+
+if __name__ == "__main__":
+    migrate_embeddings()
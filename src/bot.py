@@ -10,6 +10,9 @@ Required AI services:
 - OpenAI (LLM)
 - Cartesia (Text-to-Speech)
 
+For lowest latency, run the worker in the same region as the STT/TTS providers and
+point DEEPGRAM_BASE_URL / CARTESIA_URL at their regional endpoints.
+
 Run the bot using:
     For browser client:
         uv run bot.py
@@ -20,32 +23,80 @@ Run the bot using:
 """
 
 import os
+import asyncio
 import aiohttp
 from dotenv import load_dotenv
 from loguru import logger
-from typing import Optional
+from typing import NamedTuple, Optional
 import time
-import uuid
+from urllib.parse import urlparse
 
 from pipecat.runner.types import RunnerArguments, SmallWebRTCRunnerArguments, DailyRunnerArguments
 from pipecat.runner.utils import create_transport, parse_telephony_websocket
-from pipecat.transports.base_transport import BaseTransport
+from pipecat.transports.base_transport import BaseTransport, TransportParams
 from pipecat.transports.network.small_webrtc import SmallWebRTCTransport
 from pipecat.transports.websocket.fastapi import FastAPIWebsocketTransport, FastAPIWebsocketParams
 from pipecat.transports.daily.transport import DailyTransport, DailyParams
 from pipecat.transports.daily.utils import DailyRESTHelper, DailyRoomParams, DailyRoomProperties
 from pipecat.serializers.twilio import TwilioFrameSerializer
 
-from pipeline import NudgePipeline, get_transport_params
+from graph import get_graph
+from pipeline import (
+    NudgePipeline,
+    create_vad_analyzer,
+    get_transport_params,
+    release_transport_params,
+    warmup,
+)
 
 load_dotenv(override=True)
 
+
+def _tag_session(record):
+    """Prefix records logged inside a session with its IDs (see NudgePipeline.run)."""
+    extra = record["extra"]
+    if extra["session_id"] != "-":
+        record["message"] = f"[{extra['session_id']} | {extra['user_id']}] {record['message']}"
+
+
+# Set on the logger core rather than as a sink format: pipecat's runner main() replaces the
+# stderr sink (to apply -v), which would discard a custom format
+logger.configure(extra={"user_id": "-", "session_id": "-"}, patcher=_tag_session)
+
+
+class _DailyConfig(NamedTuple):
+    api_key: str
+    api_url: str
+
+
+class _TwilioConfig(NamedTuple):
+    account_sid: str
+    auth_token: str
+
+
+# Provider settings are read once at import (after .env is loaded) rather than per session
+_DAILY = _DailyConfig(
+    api_key=os.getenv("DAILY_API_KEY", ""),
+    api_url=os.getenv("DAILY_API_URL", "https://api.daily.co/v1"),
+)
+_TWILIO = _TwilioConfig(
+    account_sid=os.getenv("TWILIO_ACCOUNT_SID", ""),
+    auth_token=os.getenv("TWILIO_AUTH_TOKEN", ""),
+)
+
 print("🚀 Starting Pipecat bot...")
 
+# Shared Daily REST session/helper so room create/delete reuse one keep-alive connection.
+# It lives for the whole worker process and is released when the process exits.
+_daily_session: Optional[aiohttp.ClientSession] = None
+_daily_helper: Optional[DailyRESTHelper] = None
+_daily_lock = asyncio.Lock()
+
 
-async def create_webrtc_transport(args: SmallWebRTCRunnerArguments) -> Optional[BaseTransport]:
+async def create_webrtc_transport(
+    args: SmallWebRTCRunnerArguments, transport_params: TransportParams
+) -> Optional[BaseTransport]:
     """Create WebRTC transport for browser clients."""
-    transport_params = get_transport_params()
     return SmallWebRTCTransport(
         webrtc_connection=args.webrtc_connection,
         params=transport_params
@@ -60,11 +111,11 @@ async def create_twilio_transport(args: RunnerArguments) -> Optional[BaseTranspo
     serializer = TwilioFrameSerializer(
         stream_sid=call_data["stream_id"],
         call_sid=call_data["call_id"],
-        account_sid=os.getenv("TWILIO_ACCOUNT_SID", ""),
-        auth_token=os.getenv("TWILIO_AUTH_TOKEN", ""),
+        account_sid=_TWILIO.account_sid,
+        auth_token=_TWILIO.auth_token,
     )
 
-    vad_analyzer = get_transport_params().vad_analyzer
+    vad_analyzer = create_vad_analyzer()
     # Configure WebSocket transport with Twilio parameters
     return FastAPIWebsocketTransport(
         websocket=args.websocket,
@@ -77,67 +128,69 @@ async def create_twilio_transport(args: RunnerArguments) -> Optional[BaseTranspo
         ),
     )
 
+async def get_daily_helper() -> DailyRESTHelper:
+    """Get the shared DailyRESTHelper, opening its aiohttp session on first use."""
+    global _daily_session, _daily_helper
+    async with _daily_lock:
+        if _daily_session is None or _daily_session.closed:
+            _daily_session = aiohttp.ClientSession()
+            _daily_helper = DailyRESTHelper(
+                daily_api_key=_DAILY.api_key,
+                daily_api_url=_DAILY.api_url,
+                aiohttp_session=_daily_session
+            )
+        return _daily_helper
+
 async def create_daily_room_and_token() -> tuple[str, str, str]:
     """Create a new Daily room and return room_url, token, and room_name."""
-    async with aiohttp.ClientSession() as session:
-        daily_helper = DailyRESTHelper(
-            daily_api_key=os.getenv("DAILY_API_KEY"),
-            daily_api_url=os.getenv("DAILY_API_URL", "https://api.daily.co/v1"),
-            aiohttp_session=session
-        )
-        
-        # Create room optimized for 1:1 voice-only sessions (5-minute limit)
-        room_params = DailyRoomParams(
-            privacy="public",
-            properties=DailyRoomProperties(
-                exp=time.time() + (5 * 60),  # 5 minutes from now
-                eject_at_room_exp=True,  # Remove participants when room expires
-                max_participants=2,  # 1:1 session (user + bot)
-                enable_chat=False,  # Voice-only, no text chat
-                enable_prejoin_ui=False,  # Direct join
-                start_video_off=True,  # Audio-only bot
-                start_audio_off=False,  # Audio should be on
-                enable_recording=None,  # No recording needed
-                enable_transcription_storage=False,  # Using Deepgram instead
-                enable_emoji_reactions=False,  # No visual elements
-                geo="us-east-1"  # Optimize for your primary user base
-            )
+    daily_helper = await get_daily_helper()
+    # Create room optimized for 1:1 voice-only sessions (5-minute limit)
+    room_params = DailyRoomParams(
+        privacy="public",
+        properties=DailyRoomProperties(
+            exp=time.time() + (5 * 60),  # 5 minutes from now
+            eject_at_room_exp=True,  # Remove participants when room expires
+            max_participants=2,  # 1:1 session (user + bot)
+            enable_chat=False,  # Voice-only, no text chat
+            enable_prejoin_ui=False,  # Direct join
+            start_video_off=True,  # Audio-only bot
+            start_audio_off=False,  # Audio should be on
+            enable_recording=None,  # No recording needed
+            enable_transcription_storage=False,  # Using Deepgram instead
+            enable_emoji_reactions=False,  # No visual elements
+            geo="us-east-1"  # Optimize for your primary user base
         )
-        
-        # Create the room
-        room = await daily_helper.create_room(room_params)
-        logger.info(f"Created Daily room: {room.name} (expires in 5 minutes for 1:1 session)")
-        
-        # Get a token for the bot (5-minute session)
-        token = await daily_helper.get_token(room.url, expiry_time=5 * 60)  # 5 minutes
-        
-        return room.url, token, room.name
+    )
+    
+    # Create the room
+    room = await daily_helper.create_room(room_params)
+    logger.info(f"Created Daily room: {room.name} (expires in 5 minutes for 1:1 session)")
+    
+    # Get a token for the bot (5-minute session)
+    token = await daily_helper.get_token(room.url, expiry_time=5 * 60)  # 5 minutes
+    
+    return room.url, token, room.name
 
 async def delete_daily_room(room_name: str) -> bool:
     """Delete a Daily room by name."""
-    async with aiohttp.ClientSession() as session:
-        daily_helper = DailyRESTHelper(
-            daily_api_key=os.getenv("DAILY_API_KEY"),
-            daily_api_url=os.getenv("DAILY_API_URL", "https://api.daily.co/v1"),
-            aiohttp_session=session
-        )
-        
-        try:
-            await daily_helper.delete_room_by_name(room_name)
-            logger.info(f"Successfully deleted Daily room: {room_name}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to delete Daily room {room_name}: {e}")
-            return False
-
-async def create_daily_transport(args: DailyRunnerArguments) -> Optional[BaseTransport]:
+    daily_helper = await get_daily_helper()
+    try:
+        await daily_helper.delete_room_by_name(room_name)
+        logger.info(f"Successfully deleted Daily room: {room_name}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to delete Daily room {room_name}: {e}")
+        return False
+
+async def create_daily_transport(
+    args: DailyRunnerArguments, transport_params: TransportParams
+) -> Optional[BaseTransport]:
     """Create Daily transport for Daily clients."""
-    transport_params = get_transport_params()
     
     # Create Daily-specific parameters optimized for 1:1 voice sessions
     daily_params = DailyParams(
-        api_url=os.getenv("DAILY_API_URL", "https://api.daily.co/v1"),
-        api_key=os.getenv("DAILY_API_KEY", ""),
+        api_url=_DAILY.api_url,
+        api_key=_DAILY.api_key,
         audio_in_enabled=transport_params.audio_in_enabled,
         audio_out_enabled=transport_params.audio_out_enabled,
         vad_analyzer=transport_params.vad_analyzer,
@@ -162,6 +215,7 @@ async def bot(runner_args: RunnerArguments):
     sample_rates = (16000, 16000)  # Default for WebRTC
     user_id = None
     room_name = None  # Track room name for cleanup
+    transport_params = None  # Pooled analyzers to release when the session ends
     
     # Extract user_id and session_id from runner_args if available
     session_id = None
@@ -172,13 +226,14 @@ async def bot(runner_args: RunnerArguments):
 
     # If no session_id provided, generate a unique one
     if not session_id:
-        session_id = f"session_{uuid.uuid4().hex[:8]}"
+        session_id = f"session_{os.urandom(4).hex()}"
         logger.info(f"Generated session_id: {session_id}")
 
     try:
         # Select transport based on runner arguments type
         if isinstance(runner_args, SmallWebRTCRunnerArguments):
-            transport = await create_webrtc_transport(runner_args)
+            transport_params = get_transport_params()
+            transport = await create_webrtc_transport(runner_args, transport_params)
         elif isinstance(runner_args, DailyRunnerArguments):
             # For Daily, we need to create a room first if it doesn't exist
             if not runner_args.room_url or not runner_args.token:
@@ -189,10 +244,10 @@ async def bot(runner_args: RunnerArguments):
                 runner_args.token = token
             else:
                 # Extract room name from existing URL for cleanup
-                from urllib.parse import urlparse
-                room_name = urlparse(runner_args.room_url).path[1:]
+                room_name = urlparse(runner_args.room_url).path.strip('/')
                 
-            transport = await create_daily_transport(runner_args)
+            transport_params = get_transport_params()
+            transport = await create_daily_transport(runner_args, transport_params)
             # Use 16kHz for Silero VAD compatibility (Silero only supports 8kHz or 16kHz)
             # Daily transport will handle resampling internally as needed
             sample_rates = (16000, 16000)
@@ -222,6 +277,8 @@ async def bot(runner_args: RunnerArguments):
         logger.error(f"Error in bot execution: {e}")
         raise
     finally:
+        if transport_params is not None:
+            release_transport_params(transport_params)
         # Clean up Daily room if we created one
         if room_name and isinstance(runner_args, DailyRunnerArguments):
             logger.info(f"Cleaning up Daily room: {room_name}")
@@ -230,4 +287,8 @@ async def bot(runner_args: RunnerArguments):
 
 if __name__ == "__main__":
     from pipecat.runner.run import main
+
+    # Load models and the Graph before the runner starts accepting connections
+    warmup()
+    get_graph()
     main()
\ No newline at end of file
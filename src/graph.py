@@ -5,20 +5,26 @@ It integrates with MongoDB for persistent memory storage and retrieval.
 """
 
 
+import asyncio
 import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import AsyncGenerator, Dict, List, Optional, TypedDict
 
 import yaml
 from dotenv import load_dotenv
 from typing import Annotated
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langgraph.graph.message import add_messages
+from langchain_core.runnables import RunnableLambda
 from langchain_core.runnables.config import RunnableConfig
 from langchain_openai import OpenAIEmbeddings
 from langgraph.checkpoint.mongodb import MongoDBSaver
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.store.memory import InMemoryStore
-from langchain_anthropic import ChatAnthropic
 from langmem import ReflectionExecutor, create_memory_store_manager
 from langmem import create_manage_memory_tool, create_search_memory_tool
 from langgraph.graph import END, StateGraph, START
@@ -29,29 +35,120 @@ from loguru import logger
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 load_dotenv()
 
+# text-embedding-3 models support shortened (Matryoshka) embeddings; setting this to 512 keeps
+# recall close to the native 1536 while cutting index memory and search bandwidth ~3x. Changing
+# it requires re-embedding existing memories (deployment/scripts/migrate_embeddings.py).
+EMBEDDING_DIMS = int(os.getenv("MEMORY_EMBEDDING_DIMS", "1536"))
+
+@lru_cache(maxsize=1)
 def load_prompts() -> Dict[str, str]:
-    """Load system prompts from YAML config."""
+    """Load system prompts from YAML config (parsed once per process)."""
     config_path = os.path.join(os.path.dirname(__file__), "prompts", "prompts.yaml")
     with open(config_path, "r") as f:
-        prompts = yaml.safe_load(f)
+        prompts = yaml.load(f, Loader=_YamlLoader)
     return prompts.get("system", {})
 
+# Bare greetings are answered directly, without an embedding/LLM round-trip
+_GREETING_PATTERN = re.compile(r"^\s*(hi|hello|hey)( there)?[\s.!,]*$", re.IGNORECASE)
+_DEFAULT_GREETING = "Hi there! How's your day going?"
+
+def _content_of(message):
+    """Content of a message given either as a dict or as a message object."""
+    if type(message) is dict:
+        return message.get("content")
+    return getattr(message, "content", None)
+
+@lru_cache(maxsize=1024)
+def _run_config(user_id: str, session_id: str) -> RunnableConfig:
+    """Agent run config for a user session, built once per (user, session)."""
+    return {"configurable": {"thread_id": session_id, "user_id": user_id}}
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that memoizes query vectors by normalized query text.
+
+    Memory searches frequently repeat the same query within and across turns; each
+    hit saves an embedding API round-trip. Document embeddings are passed through.
+    """
+
+    def __init__(self, embeddings: Embeddings, maxsize: int = 512):
+        self._embeddings = embeddings
+        self._maxsize = maxsize
+        self._cache: OrderedDict[str, List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+            return vector
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._maxsize:
+                self._cache.popitem(last=False)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = text.strip().lower()
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self._embeddings.embed_query(text)
+            self._remember(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = text.strip().lower()
+        vector = self._lookup(key)
+        if vector is None:
+            vector = await self._embeddings.aembed_query(text)
+            self._remember(key, vector)
+        return vector
+
 class ChatState(TypedDict):
     """State maintained between conversation turns."""
     messages: Annotated[list, add_messages] # Current conversation session's messages
 
-model = ChatAnthropic(model="claude-3-haiku-20240307", temperature=0)
-
 class Graph:
     """Simplified memory management graph using Langgraph with MongoDB."""
     
     def __init__(self):
         # Load prompts from YAML
         self.prompts = load_prompts()
+        # The system prompt is static, so build its message once for every agent step. It is
+        # marked cacheable so Anthropic reuses the prefix (tools + system) across turns
+        # instead of reprocessing it on every request.
+        system_prompt = self.prompts.get("draft_2", "")
+        self._system_message = SystemMessage(
+            content=[
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ]
+            if system_prompt
+            else ""
+        )
         logger.info("Initializing global Graph instance")
+        # Bounds in-flight agent runs across all sessions so bursts stay under provider limits
+        self._llm_semaphore = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", "16")))
         
+        # Query embeddings are cached so repeated memory searches skip the OpenAI call
+        embeddings = CachedEmbeddings(
+            OpenAIEmbeddings(model="text-embedding-3-small", dimensions=EMBEDDING_DIMS)
+        )
+
         # # Create MongoDB store for vector search
         use_mongodb = os.getenv("USE_MONGODB", "true").lower() == "true"
         if use_mongodb:
@@ -62,18 +159,13 @@ class Graph:
                 
             self.client = MongoClient(self.mongodb_uri, server_api=ServerApi('1'))
             
-            # Test connection
-            try:
-                self.client.admin.command('ping')
-                logger.info("Successfully connected to MongoDB!")
-            except Exception as e:
-                logger.error(f"Failed to connect to MongoDB: {e}")
-                raise
-            
             ##Setup database and collections
             self.db = self.client["memories"]
             self.collection = self.db["memory_store"]
             
+            # Test connection in the background so construction doesn't stall on a round-trip
+            threading.Thread(target=self._ping_mongodb, daemon=True).start()
+            
             ##Create checkpointer for conversation state
             self.checkpointer = MongoDBSaver(
                 self.client, 
@@ -85,18 +177,20 @@ class Graph:
                 index_config=VectorIndexConfig(
                 fields=None,
                 filters=None,
-                dims=1536,
-                embed=OpenAIEmbeddings(model="text-embedding-3-small"),
+                dims=EMBEDDING_DIMS,
+                embed=embeddings,
                 ),
-                auto_index_timeout=70,
+                # Indexes are created out-of-band (deployment/scripts/init_indexes.py), so
+                # workers never block startup waiting for an index build
+                auto_index_timeout=int(os.getenv("MEMORY_INDEX_TIMEOUT", "0")),
             )
 
         else:
             self.checkpointer = MemorySaver()
             self.store = InMemoryStore(
                 index={
-                    "dims": 1536,
-                    "embed": "openai:text-embedding-3-small"
+                    "dims": EMBEDDING_DIMS,
+                    "embed": embeddings
                 }
             )
 
@@ -111,23 +205,84 @@ class Graph:
             store=self.store,
         )
 
-        
-    def get_agent(self, user_id: str):
-        """Create a react agent with the memory tools"""
-        return create_react_agent(
+        # The agent doesn't depend on the user (memory namespaces are resolved from the
+        # run config), so compile it once and share it across users and turns
+        self.agent = create_react_agent(
                 #"openai:gpt-4o-mini",
                 "anthropic:claude-3-haiku-20240307",
-                prompt=self._create_prompt,
+                # Sync and async variants so astream/ainvoke build the prompt on the event
+                # loop instead of dispatching the sync callable to a worker thread
+                prompt=RunnableLambda(self._create_prompt, afunc=self._acreate_prompt),
                 tools=[self.manage_memory_tool, self.search_memory_tool],
                 store=self.store,
                 checkpointer=self.checkpointer,
             )
+
+    def _ping_mongodb(self):
+        """Verify the MongoDB connection and log the outcome."""
+        try:
+            self.client.admin.command('ping')
+            logger.info("Successfully connected to MongoDB!")
+        except Exception as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            return
+        self._check_vector_index()
+
+    def _check_vector_index(self):
+        """Warn once at startup if the memory index still uses the deprecated knnVector type.
+
+        Legacy Atlas Search `knnVector` mappings are slower and recall worse than native
+        `vectorSearch` indexes; they need to be dropped and recreated to migrate.
+        """
+        try:
+            for index in self.collection.list_search_indexes():
+                definition = index.get("latestDefinition", {})
+                fields = definition.get("mappings", {}).get("fields", {})
+                # A field maps to one type definition or to a list of them
+                field_types = [
+                    field_type
+                    for field in fields.values()
+                    for field_type in (field if isinstance(field, list) else [field])
+                ]
+                if any(field_type.get("type") == "knnVector" for field_type in field_types):
+                    logger.warning(
+                        f"Search index '{index.get('name')}' uses deprecated knnVector; "
+                        "recreate it as a vectorSearch index"
+                    )
+        except Exception as e:
+            logger.error(f"Failed to inspect MongoDB search indexes: {e}")
+
+    def fast_reply(self, message: str) -> Optional[str]:
+        """Return a canned reply for trivial messages that don't need the agent, else None."""
+        if _GREETING_PATTERN.match(message):
+            return self.prompts.get("greeting", _DEFAULT_GREETING)
+        return None
+
+    async def record_exchange(self, message: str, reply: str, session_id: str, user_id: str):
+        """Append a user message and a reply given outside the agent to the session's thread."""
+        config = _run_config(user_id, session_id)
+        try:
+            # Recorded as the agent's own output, so the next run continues from a finished turn
+            await self.agent.aupdate_state(
+                config,
+                {"messages": [HumanMessage(content=message), AIMessage(content=reply)]},
+                as_node="agent",
+            )
+        except Exception as e:
+            logger.error(f"Error recording exchange: {e}")
+
+    def get_agent(self, user_id: str):
+        """Return the react agent with the memory tools"""
+        return self.agent
         
     def _create_prompt(self, state, config: RunnableConfig):
         """Create prompt with memory injection from vector store."""
-        prompt = self.prompts.get("draft_2", "")
-        messages = [SystemMessage(content=prompt)] + state["messages"]
-        return messages
+        # Unpack into one list rather than concatenating a temporary one-element list
+        return [self._system_message, *state["messages"]]
+
+    async def _acreate_prompt(self, state, config: RunnableConfig):
+        """Async variant of `_create_prompt` used when the agent runs asynchronously."""
+        return self._create_prompt(state, config)
 
     async def process_message(self, message: str, session_id: str, user_id: str) -> str:
         """Process a message through the simplified memory graph.
@@ -142,17 +297,18 @@ class Graph:
         """
         logger.info(f"Processing message with user_id: {user_id}, session_id: {session_id}")
         # Include user_id in config for proper memory isolation
-        config = {"configurable": {"thread_id": session_id, "user_id": user_id}}
+        config = _run_config(user_id, session_id)
         
         try:
             # Get user-specific agent for isolated memory operations
             agent = self.get_agent(user_id)
             
             # Invoke the agent with the user message, including user_id for memory isolation
-            response = agent.invoke(
-                {"messages": [HumanMessage(content=message)]},
-                config=config,
-            )
+            async with self._llm_semaphore:
+                response = await agent.ainvoke(
+                    {"messages": [HumanMessage(content=message)]},
+                    config=config,
+                )
             # Extract the response content
             if response and "messages" in response and response["messages"]:
                 logger.info(f"Response: {response['messages'][-1].content}")
@@ -177,44 +333,34 @@ class Graph:
             Token chunks from the LLM response
         """
         logger.info(f"Streaming message with user_id: {user_id}, session_id: {session_id}")
-        config = {"configurable": {"thread_id": session_id, "user_id": user_id}}
+        config = _run_config(user_id, session_id)
         
         try:
             # Get user-specific agent for isolated memory operations
             agent = self.get_agent(user_id)
             
-            # Stream the agent response with user_id for memory isolation
-            async for chunk in agent.astream(
-                {"messages": [HumanMessage(content=message)]},
-                config=config,
-            ):
-                logger.info(f"Streaming response: {chunk}")
-                # Extract content from streaming chunks
-                if "agent" in chunk and "messages" in chunk["agent"]:
-                    messages = chunk["agent"]["messages"]
-                    if messages:
-                        last_message = messages[-1]
-                        content = None
-                        
-                        # Handle different message formats
-                        if hasattr(last_message, 'content'):
-                            content = last_message.content
-                        elif isinstance(last_message, dict) and last_message.get('content'):
-                            content = last_message['content']
-                            
-                        # Suppress assistant text when a tool_use is present in the same chunk
-                        if isinstance(content, list):
-                            has_tool_use = any(
-                                isinstance(part, dict) and part.get('type') == 'tool_use'
-                                for part in content
-                            )
-                            if has_tool_use:
-                                # Do not yield any text yet; wait for tool result and next agent message
-                                continue
-
-                        if content:
-                            logger.info(f"Extracted content: {content}")
-                            yield content
+            async with self._llm_semaphore:
+                # Stream LLM tokens as they are generated (not whole agent messages), so text
+                # can be sent on to TTS while the rest of the reply is still being produced
+                async for message_chunk, metadata in agent.astream(
+                    {"messages": [HumanMessage(content=message)]},
+                    config=config,
+                    stream_mode="messages",
+                ):
+                    # Only the model's own output; tool results are streamed from the tools node
+                    if metadata.get("langgraph_node") != "agent":
+                        continue
+                    content = _content_of(message_chunk)
+                    if isinstance(content, list):
+                        # Anthropic chunks are content blocks; skip tool_use/input_json deltas
+                        content = "".join(
+                            part.get("text", "")
+                            for part in content
+                            if isinstance(part, dict) and part.get("type") == "text"
+                        )
+                    if content:
+                        logger.debug(f"Streaming token: {content}")
+                        yield content
                         
         except Exception as e:
             logger.error(f"Error streaming message: {e}")
@@ -223,14 +369,18 @@ class Graph:
 
 # Global Graph instance
 _graph_instance: Optional[Graph] = None
+_graph_lock = threading.Lock()
 
 def get_graph() -> Graph:
     """Get the global Graph instance, initializing it if needed."""
     global _graph_instance
     if _graph_instance is None:
-        logger.info("Initializing global Graph instance")
-        _graph_instance = Graph()
-        logger.info("Global Graph instance initialized successfully")
+        # Double-checked so concurrent first callers don't build (and leak) a second client
+        with _graph_lock:
+            if _graph_instance is None:
+                logger.info("Initializing global Graph instance")
+                _graph_instance = Graph()
+                logger.info("Global Graph instance initialized successfully")
     return _graph_instance
 
 
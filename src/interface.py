@@ -4,21 +4,31 @@ This module implements a custom FrameProcessor following PipeCat's official docu
 patterns for handling frames and streaming responses through our memory-enhanced system.
 """
 
+import asyncio
+import re
 import uuid
-from typing import Dict
+from typing import Callable, Dict, Optional, Tuple
 
 from loguru import logger
 
-from graph import get_graph
+from graph import Graph, get_graph
 
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 from pipecat.frames.frames import (
     Frame, 
+    InterimTranscriptionFrame,
     TextFrame,
     LLMFullResponseStartFrame,
     LLMFullResponseEndFrame
 )
 
+# Streamed tokens are pushed at sentence/clause boundaries: TTS can start synthesizing the
+# first sentence while the LLM is still generating, with few TextFrames (and event-loop hops)
+# per response. Chunks are never cut on a timer, which would split phrases mid-word at normal
+# token rates.
+SENTENCE_END = re.compile(r'[.?!]\s*$')
+MIN_CLAUSE_WORDS = 4
+
 class Processor(FrameProcessor):
     """Custom FrameProcessor that integrates LangGraph memory management with PipeCat pipeline.
     It handles LLM message frames and streams responses using our MongoDB-backed memory system.
@@ -26,55 +36,115 @@ class Processor(FrameProcessor):
 
     def __init__(self, user_id: str, session_id: str, **kwargs):
         super().__init__(**kwargs)
-        # Use the global Graph instance instead of creating a new one
-        self.graph = get_graph()
+        # The global Graph instance is resolved lazily (off the event loop) so constructing
+        # the processor never blocks on MongoDB/OpenAI client setup
+        self._graph: Optional[Graph] = None
+        self._graph_lock = asyncio.Lock()
+        self._first_turn = True  # Canned greeting replies only open a session
         self._session_id = session_id
         self._user_id = user_id
         logger.info(f"Initialized LangGraph processor with user_id: {self._user_id}, session_id: {self._session_id}")
+
+    async def _ensure_graph(self) -> Graph:
+        """Return the global Graph, initializing it in a worker thread on first use."""
+        if self._graph is None:
+            async with self._graph_lock:
+                if self._graph is None:
+                    self._graph = await asyncio.to_thread(get_graph)
+        return self._graph
         
+    # Handler per (frame type, direction), resolved once per frame class and shared by all
+    # processors, so high-rate audio frames cost one dict lookup instead of a type check
+    _frame_handlers: Dict[Tuple[type, FrameDirection], Optional[Callable]] = {}
+
+    @classmethod
+    def _resolve_handler(cls, frame_type: type, direction: FrameDirection) -> Optional[Callable]:
+        if direction != FrameDirection.DOWNSTREAM:
+            return None
+        # Partial transcripts are also TextFrames; they must not trigger a response
+        if issubclass(frame_type, InterimTranscriptionFrame):
+            return cls._handle_interim_transcription
+        # Handle text frames from STT flowing downstream towards TTS; avoid reacting to our own
+        # TTS audio. STT emits TextFrame subclasses, so match on the class hierarchy.
+        if issubclass(frame_type, TextFrame):
+            return cls._handle_text_frame
+        return None
+
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         # call parent class process_frame
         await super().process_frame(frame, direction) 
         
-        # Handle text frames from STT flowing downstream towards TTS; avoid reacting to our own TTS audio
-        if isinstance(frame, TextFrame) and direction == FrameDirection.DOWNSTREAM:
-            logger.info(f"Processing text frame: {frame.text}")
-            # Signal response start
-            await self.push_frame(LLMFullResponseStartFrame(), direction)
-            # Stream response through our memory-enhanced graph
-            await self._stream_langgraph_response(frame.text, direction)
-            # Signal response end  
-            await self.push_frame(LLMFullResponseEndFrame(), direction)
-            # Don't forward the original TextFrame since we handled it
+        key = (type(frame), direction)
+        try:
+            handler = self._frame_handlers[key]
+        except KeyError:
+            handler = self._frame_handlers[key] = self._resolve_handler(*key)
+        
+        if handler is not None:
+            await handler(self, frame, direction)
             return
         
         # Forward all other frames through the pipeline
         await self.push_frame(frame, direction)
+
+    async def _handle_interim_transcription(self, frame: InterimTranscriptionFrame, direction: FrameDirection):
+        # The user is still speaking; only the final transcript is answered, so consume it
+        pass
+
+    async def _handle_text_frame(self, frame: TextFrame, direction: FrameDirection):
+        logger.info(f"Processing text frame: {frame.text}")
+        # Nothing to answer for an empty transcript
+        if not frame.text.strip():
+            return
+        graph = await self._ensure_graph()
+        fast_reply = graph.fast_reply(frame.text) if self._first_turn else None
+        self._first_turn = False
+        # Signal response start
+        await self.push_frame(LLMFullResponseStartFrame(), direction)
+        if fast_reply is not None:
+            # Trivial turn (e.g. a bare greeting): answer directly without the agent
+            await self.push_frame(TextFrame(text=fast_reply), direction)
+        else:
+            # Stream response through our memory-enhanced graph
+            await self._stream_langgraph_response(frame.text, direction)
+        # Signal response end  
+        await self.push_frame(LLMFullResponseEndFrame(), direction)
+        if fast_reply is not None:
+            # Keep the exchange in the conversation history; written only after the end frame
+            # so TTS isn't held waiting on the checkpoint round-trip
+            await graph.record_exchange(frame.text, fast_reply, self._session_id, self._user_id)
+        # Don't forward the original TextFrame since we handled it
     
     async def _stream_langgraph_response(self, message: str, direction: FrameDirection):
         """Stream response from LangGraph with proper error handling."""
         token_buffer = ""
         
         try:
+            graph = await self._ensure_graph()
             # Stream response through our memory-enhanced graph
-            async for token in self.graph.stream_message(
+            async for token in graph.stream_message(
                 message=message,
                 session_id=self._session_id,
                 user_id=self._user_id
             ):
                 token_buffer += token
                 
-                # Send chunks when we have complete words/phrases for better TTS
-                if token_buffer.endswith((' ', '.', '!', '?', ',', '\n')) or len(token_buffer) > 24:
+                # Send a chunk at the end of a sentence or at a comma after a full clause. Chunks
+                # are pushed unstripped: tokens carry their leading space and the TTS aggregator
+                # concatenates frames as-is, so stripping would glue words together.
+                if SENTENCE_END.search(token_buffer) or (
+                    token_buffer.rstrip().endswith(',')
+                    and len(token_buffer.split()) >= MIN_CLAUSE_WORDS
+                ):
                     if token_buffer.strip():
-                        logger.debug(f"Streaming text chunk: {token_buffer.strip()}")
-                        await self.push_frame(TextFrame(text=token_buffer.strip()), direction)
-                        token_buffer = ""
+                        logger.debug(f"Streaming text chunk: {token_buffer}")
+                        await self.push_frame(TextFrame(text=token_buffer), direction)
+                    token_buffer = ""
                         
             # Send any remaining content
             if token_buffer.strip():
-                logger.debug(f"Final text chunk: {token_buffer.strip()}")
-                await self.push_frame(TextFrame(text=token_buffer.strip()), direction)
+                logger.debug(f"Final text chunk: {token_buffer}")
+                await self.push_frame(TextFrame(text=token_buffer), direction)
                 
         except Exception as e:
             logger.error(f"Error in LangGraph streaming: {e}")
@@ -82,7 +152,8 @@ class Processor(FrameProcessor):
             # Fallback to non-streaming response
             try:
                 logger.info(f"Fallback processing (non-streaming): {message}")
-                response = await self.graph.process_message(
+                graph = await self._ensure_graph()
+                response = await graph.process_message(
                     message=message,
                     session_id=self._session_id,
                     user_id=self._user_id
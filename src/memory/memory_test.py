@@ -28,42 +28,6 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-#logger.debug(f"Connecting to: {MONGODB_URI}")
-
-# Create a new client and connect to the server
-client = MongoClient(MONGODB_URI, server_api=ServerApi('1'))
-# Send a ping to confirm a successful connection
-try:
-    client.admin.command('ping')
-    logger.info("Pinged your deployment. You successfully connected to MongoDB!")
-except Exception as e:
-    logger.error(e)
-
-# client = MongoClient(MONGODB_URI)
-
-
-db = client["memories"]
-collection = db["memory_store"]
-
-logger.info("Creating store..")
-# Create store directly
-store = MongoDBStore(
-    collection=collection,
-    index_config=VectorIndexConfig(
-        fields=None,
-        filters=None,
-        dims=1536,
-        embed=OpenAIEmbeddings(
-            model="text-embedding-3-small"
-        ),  # Pass an instance of OpenAIEmbeddings
-    ),
-    auto_index_timeout=70,
-)
-
-checkpointer = MongoDBSaver(
-    client, db_name="memories", collection_name="thread_checkpoints"
-)
-
 def prompt(state, store):
     """Prepare the messages for the LLM by injecting memories."""
     memories = store.search(
@@ -83,40 +47,83 @@ def prompt(state, store):
     return [{"role": "system", "content": system_msg}, *state["messages"]]
 
 
-# 3. Create the agent with the memory tool
-agent = create_react_agent(
-    "openai:gpt-4o-mini",
-    prompt=lambda state: prompt(state, store),  # Pass the store to the prompt function
-    tools=[
-        create_manage_memory_tool(namespace=("memories",)),
-    ],
-    store=store,
-    checkpointer=checkpointer,
-)
-
-
-config = {"configurable": {"thread_id": "thread-a"}}
-
-response = agent.invoke(
-    {
-        "messages": [
-            {
-                "role": "user",
-                "content": "Remember I am vegan. I like beaches and dancing. Once I went to Rome and loved the food!"
-            }
-        ]
-    },
-    config=config,
-)
-logger.info("Response 1: " + response["messages"][-1].content)
-
-
-response = agent.invoke(
-    {
-        "messages": [
-            {"role": "user", "content": "Help me plan a trip aligned with what I like."}
-        ]
-    },
-    config=config,
-)
-logger.info("Response 2: " + response["messages"][-1].content)
\ No newline at end of file
+def main():
+    #logger.debug(f"Connecting to: {MONGODB_URI}")
+
+    # Create a new client and connect to the server
+    client = MongoClient(MONGODB_URI, server_api=ServerApi('1'))
+    # Send a ping to confirm a successful connection
+    try:
+        client.admin.command('ping')
+        logger.info("Pinged your deployment. You successfully connected to MongoDB!")
+    except Exception as e:
+        logger.error(e)
+
+    # client = MongoClient(MONGODB_URI)
+
+
+    db = client["memories"]
+    collection = db["memory_store"]
+
+    # Must match the bot's memory index (src/graph.py)
+    dims = int(os.getenv("MEMORY_EMBEDDING_DIMS", "1536"))
+    logger.info("Creating store..")
+    # Create store directly
+    store = MongoDBStore(
+        collection=collection,
+        index_config=VectorIndexConfig(
+            fields=None,
+            filters=None,
+            dims=dims,
+            embed=OpenAIEmbeddings(
+                model="text-embedding-3-small", dimensions=dims
+            ),  # Pass an instance of OpenAIEmbeddings
+        ),
+        auto_index_timeout=70,
+    )
+
+    checkpointer = MongoDBSaver(
+        client, db_name="memories", collection_name="thread_checkpoints"
+    )
+
+    # 3. Create the agent with the memory tool
+    agent = create_react_agent(
+        "openai:gpt-4o-mini",
+        prompt=lambda state: prompt(state, store),  # Pass the store to the prompt function
+        tools=[
+            create_manage_memory_tool(namespace=("memories",)),
+        ],
+        store=store,
+        checkpointer=checkpointer,
+    )
+
+
+    config = {"configurable": {"thread_id": "thread-a"}}
+
+    response = agent.invoke(
+        {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": "Remember I am vegan. I like beaches and dancing. Once I went to Rome and loved the food!"
+                }
+            ]
+        },
+        config=config,
+    )
+    logger.info("Response 1: " + response["messages"][-1].content)
+
+
+    response = agent.invoke(
+        {
+            "messages": [
+                {"role": "user", "content": "Help me plan a trip aligned with what I like."}
+            ]
+        },
+        config=config,
+    )
+    logger.info("Response 2: " + response["messages"][-1].content)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,14 @@ across different transport layers (WebRTC, Twilio, etc.).
 """
 
 import os
-import uuid
 import asyncio
-from typing import Dict, List, Optional
+import pathlib
+from typing import List, Optional
 
-import yaml
+import numpy as np
+from deepgram import LiveOptions
 from loguru import logger
-from pipecat.frames.frames import TextFrame
+from pipecat.frames.frames import BotStoppedSpeakingFrame, TTSAudioRawFrame, TTSSpeakFrame
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
@@ -19,22 +20,126 @@ from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIPro
 from pipecat.audio.turn.smart_turn.local_smart_turn_v2 import LocalSmartTurnAnalyzerV2
 from pipecat.audio.turn.smart_turn.base_smart_turn import SmartTurnParams
 from pipecat.audio.vad.silero import SileroVADAnalyzer
-from pipecat.audio.vad.vad_analyzer import VADParams
+from pipecat.audio.turn.base_turn_analyzer import BaseTurnAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams, VADState
 
 from interface import Processor
 from pipecat.runner.types import RunnerArguments, DailyRunnerArguments
 from pipecat.services.cartesia.tts import CartesiaTTSService
 from pipecat.services.deepgram.stt import DeepgramSTTService
 from pipecat.transports.base_transport import BaseTransport, TransportParams
-from pipecat.transports.daily.transport import DailyParams
 
+# Default local Smart Turn model directory (<repo>/models/smart-turn-v2), resolved once
+_SMART_TURN_MODEL_PATH = str(pathlib.Path(__file__).resolve().parents[1] / "models" / "smart-turn-v2")
 
-def get_transport_params() -> TransportParams:
-    """Get transport parameters with VAD and Smart Turn configuration."""
+# Spoken when the 5-minute session timeout is reached
+_GOODBYE_FRAME_TEXT = "Our 5-minute session is ending. Thank you for chatting with me today. Take care!"
+
+#_TTS_VOICE_ID = "78ab82d5-25be-4f7d-82b3-7ad64e5b85b2"  # Savannah
+_TTS_VOICE_ID = "00a77add-48d5-4ef6-8157-71e5437b282d"
+_TTS_MODEL = "sonic-2"  # CartesiaTTSService's default model
+
+# Goodbye audio (raw 16-bit mono PCM) synthesized at warmup. The session timeout only runs on
+# Daily sessions, which play at 16kHz.
+_GOODBYE_SAMPLE_RATE = 16000
+_goodbye_pcm: Optional[bytes] = None
+
+
+class RMSGatedSileroVADAnalyzer(SileroVADAnalyzer):
+    """SileroVADAnalyzer that skips most model runs while the user is clearly mid-speech.
+
+    Once VAD is in the SPEAKING state, a window whose RMS (and the previous window's) is
+    above `rms_gate` (fraction of full scale) reuses Silero's last confidence instead of
+    running the model, for at most `max_skipped_windows` windows in a row. Silero still
+    sees every few windows, so loud non-speech (TV, road noise) ends the turn as before.
+    """
+
+    def __init__(self, rms_gate: float = 0.05, max_skipped_windows: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self._rms_gate = rms_gate * 32768  # int16 full scale
+        self._max_skipped_windows = max_skipped_windows
+        self._prev_window_loud = False
+        self._skipped_windows = 0
+        self._last_confidence = 0.0
+
+    def voice_confidence(self, buffer) -> float:
+        samples = np.frombuffer(buffer, dtype=np.int16).astype(np.float32)
+        loud = bool(np.sqrt(np.mean(samples * samples)) > self._rms_gate)
+        skip_model = (
+            loud
+            and self._prev_window_loud
+            and self._vad_state == VADState.SPEAKING
+            and self._skipped_windows < self._max_skipped_windows
+        )
+        self._prev_window_loud = loud
+        if skip_model:
+            self._skipped_windows += 1
+            return self._last_confidence
+        self._skipped_windows = 0
+        self._last_confidence = super().voice_confidence(buffer)
+        return self._last_confidence
+
+
+class OpenVINOSileroVADAnalyzer(RMSGatedSileroVADAnalyzer):
+    """SileroVADAnalyzer running its ONNX session on the OpenVINO execution provider.
+
+    Requires the onnxruntime-openvino build; falls back to the default CPU provider when
+    it isn't installed.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        import onnxruntime
+
+        if "OpenVINOExecutionProvider" not in onnxruntime.get_available_providers():
+            logger.warning("OpenVINOExecutionProvider unavailable; Silero VAD stays on CPU")
+            return
+        session = getattr(getattr(self, "_model", None), "session", None)
+        if session is None:
+            logger.warning("Silero ONNX session not found on analyzer; Silero VAD stays on CPU")
+            return
+        self._model.session = onnxruntime.InferenceSession(
+            session._model_path,
+            providers=[("OpenVINOExecutionProvider", {"device_type": "CPU_FP32"})],
+            sess_options=session.get_session_options(),
+        )
+        logger.info("Silero VAD running on OpenVINOExecutionProvider")
+
+
+class QuantizedSmartTurnAnalyzerV2(LocalSmartTurnAnalyzerV2):
+    """LocalSmartTurnAnalyzerV2 with its transformer's Linear layers quantized to INT8.
+
+    Turn detection is a batch-1 CPU inference on every VAD stop; dynamic INT8 quantization
+    roughly halves its latency (VNNI int8 matmuls) while LayerNorm/conv stay FP32.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        import torch
+
+        model = getattr(self, "_turn_model", None)
+        if model is None:
+            logger.warning("Smart Turn model not found on analyzer; running unquantized")
+            return
+        # Dynamically quantized modules only run on CPU; keep the model as is on CUDA/MPS
+        device = str(getattr(self, "_device", "cpu"))
+        if device != "cpu":
+            logger.info(f"Smart Turn model on {device}; skipping INT8 quantization")
+            return
+        self._turn_model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info("Smart Turn model quantized to INT8")
+
+
+def create_vad_analyzer() -> VADAnalyzer:
+    """Create a VAD analyzer; it keeps per-stream state, so each transport gets its own."""
     
     using_turn_detection = True
+    use_openvino = os.getenv("VAD_EXECUTION_PROVIDER", "cpu").lower() == "openvino"
+    vad_analyzer_cls = OpenVINOSileroVADAnalyzer if use_openvino else RMSGatedSileroVADAnalyzer
     # Responsive VAD with turn detection - force 16kHz sample rate for Silero compatibility
-    vad_analyzer = SileroVADAnalyzer(
+    return vad_analyzer_cls(
                 params=VADParams(
                     confidence=0.7,      # Minimum confidence for voice detection
                     start_secs=0.2,      # Time to wait before confirming speech start
@@ -43,11 +148,27 @@ def get_transport_params() -> TransportParams:
                 ),
                 sample_rate=16000    # Force 16kHz sample rate - Silero VAD only supports 8kHz or 16kHz
     )
-    
+
+# Idle Smart Turn analyzers from finished sessions. Loading the turn model takes seconds, but
+# an analyzer also buffers the current turn's audio, so it is reused across sessions rather
+# than shared between concurrent ones. The pool keeps at most SMART_TURN_POOL_SIZE models;
+# extra analyzers from a burst of concurrent calls are freed when their session ends.
+SMART_TURN_POOL_SIZE = int(os.getenv("SMART_TURN_POOL_SIZE", "1"))
+_turn_analyzer_pool: List[BaseTurnAnalyzer] = []
+
+def acquire_turn_analyzer() -> BaseTurnAnalyzer:
+    """Take an idle Smart Turn analyzer from the pool, loading a new one if none is free."""
+    if _turn_analyzer_pool:
+        return _turn_analyzer_pool.pop()
+    return _create_turn_analyzer()
+
+def _create_turn_analyzer() -> BaseTurnAnalyzer:
     # local models directory - use environment variable if set, otherwise use default path
-    model_path = os.getenv('SMART_TURN_MODEL_PATH') or os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "smart-turn-v2")
+    model_path = os.getenv('SMART_TURN_MODEL_PATH') or _SMART_TURN_MODEL_PATH
     
-    turn_analyzer = LocalSmartTurnAnalyzerV2(
+    quantize_turn_model = os.getenv("SMART_TURN_QUANTIZE", "true").lower() == "true"
+    turn_analyzer_cls = QuantizedSmartTurnAnalyzerV2 if quantize_turn_model else LocalSmartTurnAnalyzerV2
+    return turn_analyzer_cls(
         smart_turn_model_path=model_path,
         params=SmartTurnParams(
             stop_secs=1.0,
@@ -55,12 +176,62 @@ def get_transport_params() -> TransportParams:
             max_duration_secs=8.0
         )
     )
+
+def get_transport_params() -> TransportParams:
+    """Get transport parameters with VAD and Smart Turn configuration.
+    
+    Pass the result to `release_transport_params` once the transport is done with it.
+    """
     return TransportParams(
         audio_in_enabled=True,
         audio_out_enabled=True,
-        vad_analyzer=vad_analyzer,
-        turn_analyzer=turn_analyzer
+        vad_analyzer=create_vad_analyzer(),
+        turn_analyzer=acquire_turn_analyzer()
+    )
+
+def warmup(turn_analyzers: int = SMART_TURN_POOL_SIZE):
+    """Preload voice models at worker startup so the first session doesn't pay for them.
+    
+    Fills the Smart Turn pool and runs one Silero inference so the ONNX runtime is
+    initialized before the first connection is accepted. Also pre-synthesizes the
+    session-timeout goodbye.
+    """
+    logger.info(f"Warming up voice models ({turn_analyzers} Smart Turn analyzer(s))")
+    while len(_turn_analyzer_pool) < turn_analyzers:
+        _turn_analyzer_pool.append(_create_turn_analyzer())
+    
+    vad_analyzer = create_vad_analyzer()
+    vad_analyzer.set_sample_rate(16000)
+    vad_analyzer.voice_confidence(bytes(512 * 2))  # one 512-sample window of 16-bit silence
+    
+    # The goodbye text never changes, so synthesize it once instead of waiting on TTS when a
+    # session times out
+    global _goodbye_pcm
+    if _goodbye_pcm is None:
+        try:
+            _goodbye_pcm = _synthesize_goodbye(_GOODBYE_SAMPLE_RATE)
+        except Exception as e:
+            logger.warning(f"Could not pre-synthesize goodbye audio: {e}")
+    logger.info("Voice models warmed up")
+
+def _synthesize_goodbye(sample_rate: int) -> bytes:
+    from cartesia import Cartesia
+
+    client = Cartesia(api_key=os.getenv("CARTESIA_API_KEY"))
+    chunks = client.tts.bytes(
+        model_id=_TTS_MODEL,
+        transcript=_GOODBYE_FRAME_TEXT,
+        voice={"mode": "id", "id": _TTS_VOICE_ID},
+        language="en",
+        output_format={"container": "raw", "encoding": "pcm_s16le", "sample_rate": sample_rate},
     )
+    return b"".join(chunks)
+
+def release_transport_params(params: TransportParams):
+    """Return the params' Smart Turn analyzer to the pool for the next session, if it has room."""
+    if params.turn_analyzer is not None and len(_turn_analyzer_pool) < SMART_TURN_POOL_SIZE:
+        params.turn_analyzer.clear()
+        _turn_analyzer_pool.append(params.turn_analyzer)
 
 class NudgePipeline:
     """Core pipeline implementation for Nudge bot."""
@@ -80,21 +251,35 @@ class NudgePipeline:
         self.audio_in_sample_rate = audio_in_sample_rate
         self.audio_out_sample_rate = audio_out_sample_rate
         #self.prompts = load_prompts()
-        self._session_timeout_task = None  # Track timeout task
+        self._session_timeout_handle: Optional[asyncio.TimerHandle] = None  # Pending timeout
+        self._goodbye_task: Optional[asyncio.Task] = None  # Running goodbye, once timed out
+        self._task: Optional[PipelineTask] = None  # Set once handlers are registered
+        self._bot_stopped_speaking = asyncio.Event()  # Set when TTS playback finishes
         
-        # Initialize services
+        # Initialize services. Provider endpoints can be pointed at the region nearest this
+        # worker (e.g. Deepgram's EU endpoint); network RTT dominates time-to-first-audio.
+        stt_endpoint = {"base_url": os.getenv("DEEPGRAM_BASE_URL")} if os.getenv("DEEPGRAM_BASE_URL") else {}
+        tts_endpoint = {"url": os.getenv("CARTESIA_URL")} if os.getenv("CARTESIA_URL") else {}
         self.stt = DeepgramSTTService(
             api_key=os.getenv("DEEPGRAM_API_KEY"),
-            language="en-US",
-            interim_results=True,
-            smart_format=True,
-            endpointing=True,
+            **stt_endpoint,
+            live_options=LiveOptions(
+                language="en-US",
+                interim_results=True,
+                # Turn end is decided locally (Silero stop_secs + Smart Turn), and pipecat asks
+                # Deepgram to finalize when VAD stops; server-side endpointing and smart
+                # formatting would only add finalization latency on top
+                smart_format=False,
+                endpointing=False,
+                vad_events=False,
+            ),
             keepalive = True
         )
         self.tts = CartesiaTTSService(
             api_key=os.getenv("CARTESIA_API_KEY"),
-            #voice_id="78ab82d5-25be-4f7d-82b3-7ad64e5b85b2",  # Savannah
-            voice_id="00a77add-48d5-4ef6-8157-71e5437b282d"
+            voice_id=_TTS_VOICE_ID,
+            model=_TTS_MODEL,
+            **tts_endpoint,
         )
         # Note: LLM handling is now done in the graph_processor
 
@@ -102,7 +287,7 @@ class NudgePipeline:
         if self.user_id is None:
             self.user_id = "anonymous_user"
         if self.session_id is None:
-            self.session_id = f"session_{uuid.uuid4().hex[:8]}"
+            self.session_id = f"session_{os.urandom(4).hex()}"
         
         self.graph_processor = Processor(user_id=self.user_id, session_id=self.session_id)
 
@@ -124,14 +309,17 @@ class NudgePipeline:
 
     def create_task(self) -> PipelineTask:
         """Create pipeline task with appropriate parameters."""
+        # Per-frame processing/TTFB and usage metrics are off unless explicitly enabled
+        # (e.g. while profiling); collecting them costs CPU on every processor
+        enable_metrics = os.getenv("PIPELINE_METRICS", "false").lower() == "true"
         return PipelineTask(
             self.create_pipeline(),
             params=PipelineParams(
                 allow_interruptions=True,
                 audio_in_sample_rate=self.audio_in_sample_rate,
                 audio_out_sample_rate=self.audio_out_sample_rate,
-                enable_metrics=True,
-                enable_usage_metrics=True,
+                enable_metrics=enable_metrics,
+                enable_usage_metrics=enable_metrics,
                 report_only_initial_ttfb=True
             ),
             observers=[RTVIObserver(self.rtvi)],
@@ -139,75 +327,99 @@ class NudgePipeline:
 
     async def setup_handlers(self, task: PipelineTask, runner_args: RunnerArguments):
         """Set up event handlers for the transport based on transport type."""
+        self._task = task
+        # Track when the bot finishes speaking (e.g. so the goodbye isn't cut off)
+        task.set_reached_downstream_filter((BotStoppedSpeakingFrame,))
+        task.add_event_handler("on_frame_reached_downstream", self._on_frame_reached_downstream)
         
-        # Daily transport uses RTVI events for proper handshake
+        # Daily transport uses RTVI events for proper handshake. Handlers are bound methods
+        # reading the task from self, so no per-session closures are created.
         if isinstance(runner_args, DailyRunnerArguments):
-            await self._setup_daily_handlers(task)
+            self.rtvi.add_event_handler("on_client_ready", self._on_daily_client_ready)
+            self.transport.add_event_handler("on_client_disconnected", self._on_daily_client_disconnected)
         else:
-            await self._setup_direct_handlers(task)
+            self.transport.add_event_handler("on_client_connected", self._on_client_connected)
+            self.transport.add_event_handler("on_client_disconnected", self._on_client_disconnected)
     
-    async def _setup_daily_handlers(self, task: PipelineTask):
-        """Set up Daily-specific RTVI event handlers."""
+    async def _on_frame_reached_downstream(self, task, frame):
+        if isinstance(frame, BotStoppedSpeakingFrame):
+            self._bot_stopped_speaking.set()
+
+    async def _on_daily_client_ready(self, rtvi):
+        logger.info("Daily client ready - starting conversation")
+        await rtvi.set_bot_ready()  # Confirm readiness to client
         
-        @self.rtvi.event_handler("on_client_ready")
-        async def on_client_ready(rtvi):
-            logger.info("Daily client ready - starting conversation")
-            await rtvi.set_bot_ready()  # Confirm readiness to client
-            
-            # Start 5-minute session timeout
-            self._session_timeout_task = asyncio.create_task(
-                self._handle_session_timeout(task, 5 * 60)  # 5 minutes
-            )
+        # Start 5-minute session timeout; a timer handle holds no coroutine frame while
+        # pending and cancels in O(1)
+        self._session_timeout_handle = asyncio.get_running_loop().call_later(
+            5 * 60, self._on_session_timeout  # 5 minutes
+        )
 
-        @self.transport.event_handler("on_client_disconnected")
-        async def on_client_disconnected(transport, client):
-            logger.info(f"Daily client disconnected")
-            # Cancel timeout task
-            if self._session_timeout_task:
-                self._session_timeout_task.cancel()
-            # Room cleanup is handled in bot.py finally block
-            await task.cancel()
+    async def _on_daily_client_disconnected(self, transport, client):
+        logger.info(f"Daily client disconnected")
+        # Cancel the pending timeout, or the goodbye if it already started
+        if self._session_timeout_handle:
+            self._session_timeout_handle.cancel()
+        if self._goodbye_task:
+            self._goodbye_task.cancel()
+        # Room cleanup is handled in bot.py finally block
+        await self._task.cancel()
     
-    async def _setup_direct_handlers(self, task: PipelineTask):
-        """Set up direct connection handlers for WebRTC and telephony."""
-        
-        @self.transport.event_handler("on_client_connected")
-        async def on_client_connected(transport, client):
-            logger.info(f"Client connected")
-            logger.info(f"SESSION ID: {self.session_id} | USER ID: {self.user_id}")
-            # Wait for user speech; avoid enqueueing a greeting to prevent self-response
-
-        @self.transport.event_handler("on_client_disconnected")
-        async def on_client_disconnected(transport, client):
-            logger.info(f"Client disconnected")
-            await task.cancel()
+    async def _on_client_connected(self, transport, client):
+        logger.info(f"Client connected")
+        # Wait for user speech; avoid enqueueing a greeting to prevent self-response
+
+    async def _on_client_disconnected(self, transport, client):
+        logger.info(f"Client disconnected")
+        await self._task.cancel()
 
-    async def _handle_session_timeout(self, task: PipelineTask, timeout_seconds: int):
+    def _on_session_timeout(self):
         """Handle automatic session timeout for 1:1 voice sessions."""
+        logger.info("Session timeout reached. Ending conversation gracefully.")
+        self._goodbye_task = asyncio.create_task(self._end_with_goodbye(self._task))
+
+    async def _end_with_goodbye(self, task: PipelineTask):
+        """Speak a goodbye message, then end the session once it has played."""
         try:
-            await asyncio.sleep(timeout_seconds)
-            logger.info(f"Session timeout reached ({timeout_seconds}s). Ending conversation gracefully.")
-            
-            # Send a polite goodbye message
-            goodbye_message = "Our 5-minute session is ending. Thank you for chatting with me today. Take care!"
-            await task.queue_frames([TextFrame(text=goodbye_message)])
-            # Wait a moment for the goodbye to be spoken
-            await asyncio.sleep(3)
+            # Send a polite goodbye message, as pre-synthesized audio when available
+            self._bot_stopped_speaking.clear()
+            if _goodbye_pcm and self.audio_out_sample_rate == _GOODBYE_SAMPLE_RATE:
+                # Inject the audio at TTS, below STT, so the bot doesn't transcribe (and answer)
+                # its own goodbye
+                await self.tts.queue_frame(
+                    TTSAudioRawFrame(
+                        audio=_goodbye_pcm, sample_rate=_GOODBYE_SAMPLE_RATE, num_channels=1
+                    )
+                )
+            else:
+                # A TTSSpeakFrame passes through the graph processor untouched (a TextFrame
+                # would be answered as if the user had said it)
+                await task.queue_frames([TTSSpeakFrame(text=_GOODBYE_FRAME_TEXT)])
+            # Wait for the goodbye to finish playing, bounded in case TTS fails
+            try:
+                await asyncio.wait_for(self._bot_stopped_speaking.wait(), timeout=10.0)
+            except asyncio.TimeoutError:
+                logger.warning("Goodbye message did not finish playing; ending session anyway")
             # End the session
             await task.cancel()
             
         except asyncio.CancelledError:
-            # Timeout was cancelled (user disconnected early)
-            logger.info("Session timeout cancelled (user disconnected early)")
+            # User disconnected while the goodbye was playing
+            logger.info("Session goodbye cancelled (user disconnected)")
         except Exception as e:
             logger.error(f"Error in session timeout handler: {e}")
     
     async def run(self, runner_args: RunnerArguments):
         """Run the pipeline."""
-        task = self.create_task()
-        await self.setup_handlers(task, runner_args)
-        
-        runner = PipelineRunner(
-            handle_sigint=getattr(runner_args, 'handle_sigint', False)
-        )
-        await runner.run(task)
\ No newline at end of file
+        # Tag every log record of this session (including the graph processor, services and
+        # handlers, whose tasks inherit the context) with its user and session IDs
+        with logger.contextualize(user_id=self.user_id, session_id=self.session_id):
+            task = self.create_task()
+            await self.setup_handlers(task, runner_args)
+            
+            # A runner per session: PipelineRunner cancels every task it hosts when its run()
+            # is cancelled, so a shared one would tear down all concurrent calls at once
+            runner = PipelineRunner(
+                handle_sigint=getattr(runner_args, 'handle_sigint', False)
+            )
+            await runner.run(task)
\ No newline at end of file